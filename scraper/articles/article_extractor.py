@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+記事ページの1パス抽出器
+ツリーを1回だけ走査して、タイトル・日付・本文（見出しと段落）をまとめて取り出します
+（NHKArticleScraper.get_title / get_date / get_content と同じ結果を返します）
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+from bs4 import Tag
+
+DATE_PATTERN = re.compile(r'\d{4}年\d{1,2}月\d{1,2}日')
+
+# 日付としてマッチしうる最長の文字数（例: 2025年12月31日）から1を引いたもの。
+# テキストノードをまたぐ日付を見落とさないよう、直前のノードの末尾をこの長さだけ持ち越す
+DATE_CARRY_LENGTH = 10
+
+# 本文として取り出す要素
+CONTENT_TAGS = {'h2', 'h3', 'h4', 'p', 'blockquote'}
+HEADING_TAGS = {'h2', 'h3', 'h4'}
+
+# 本文から除外するクラスとテキスト
+SKIP_CLASSES = {'share', 'sns', 'related', 'tag'}
+SKIP_TEXTS = {'INDEX', 'シェアする', 'もっと見る'}
+
+# 最初の1つだけを記録する要素
+FIRST_ONLY_TAGS = {'main', 'article', 'time', 'title'}
+
+
+def search_date(strings: Iterable[str]) -> Optional[str]:
+    """
+    テキストノードを順に走査して最初の日付を探す
+
+    全テキストを連結してから検索した場合と同じ結果を返しますが、
+    見つかった時点で走査を打ち切ります
+    """
+    carry = ''
+    for text in strings:
+        window = carry + text
+        match = DATE_PATTERN.search(window)
+        if match:
+            return match.group(0)
+        carry = window[-DATE_CARRY_LENGTH:]
+    return None
+
+
+def _is_inside(element: Tag, scope: Tag) -> bool:
+    return any(parent is scope for parent in element.parents)
+
+
+def _first_h1_text(h1s: List[Tag], scope: Tag) -> Optional[str]:
+    """scope 内の最初の h1 のテキスト（空なら None）"""
+    for h1 in h1s:
+        if _is_inside(h1, scope):
+            return h1.get_text(strip=True) or None
+    return None
+
+
+def extract_title(first: Dict[str, Tag], h1s: List[Tag]) -> Optional[str]:
+    """記事タイトル（article 内の h1 → main 内の h1 → 最初の h1 → title タグ）"""
+    for scope in (first.get('article'), first.get('main')):
+        if scope is not None:
+            title = _first_h1_text(h1s, scope)
+            if title:
+                return title
+
+    if h1s:
+        title = h1s[0].get_text(strip=True)
+        if title:
+            return title
+
+    title_tag = first.get('title')
+    if title_tag is not None:
+        # " - NHK みんなでプラス"などのサフィックスを削除
+        return title_tag.get_text(strip=True).split(' - ')[0].strip()
+
+    return None
+
+
+def extract_date(first: Dict[str, Tag]) -> Optional[str]:
+    """公開日（time タグ → article 内の日付 → main 内の最初のブロックの日付）"""
+    time_tag = first.get('time')
+    if time_tag is not None:
+        return time_tag.get_text(strip=True)
+
+    article = first.get('article')
+    if article is not None:
+        date = search_date(article.strings)
+        if date:
+            return date
+
+    main = first.get('main')
+    if main is not None:
+        first_section = main.find(['div', 'section', 'header'])
+        if first_section is not None:
+            return search_date(first_section.strings)
+
+    return None
+
+
+def extract_content(blocks: List[Tag]) -> Optional[str]:
+    """本文（見出しは「## 」付き、引用は前後に改行）"""
+    content_parts = []
+
+    for element in blocks:
+        element_class = element.get('class', [])
+        if any(cls in element_class for cls in SKIP_CLASSES):
+            continue
+
+        text = element.get_text(strip=True)
+
+        if not text or text in SKIP_TEXTS:
+            continue
+
+        if element.name in HEADING_TAGS:
+            content_parts.append(f"\n## {text}\n")
+        elif element.name == 'blockquote':
+            content_parts.append(f"\n{text}\n")
+        else:
+            content_parts.append(text)
+
+    content = '\n\n'.join(content_parts).strip()
+    return content if content else None
+
+
+def extract_article(soup) -> Dict[str, Optional[str]]:
+    """
+    ツリーを1回走査してタイトル・日付・本文を取り出す
+
+    Returns:
+        {'title', 'date', 'content'}（取得できなかった項目は None）
+    """
+    first: Dict[str, Tag] = {}
+    h1s: List[Tag] = []
+    blocks: List[Tag] = []
+
+    for element in soup.descendants:
+        if not isinstance(element, Tag):
+            continue
+        name = element.name
+        if name in FIRST_ONLY_TAGS:
+            first.setdefault(name, element)
+        elif name == 'h1':
+            h1s.append(element)
+        elif name in CONTENT_TAGS:
+            blocks.append(element)
+
+    # 本文は main（なければ article）の中の要素だけを使う
+    container = first.get('main') or first.get('article')
+    if container is not None:
+        blocks = [element for element in blocks if _is_inside(element, container)]
+
+    return {
+        'title': extract_title(first, h1s),
+        'date': extract_date(first),
+        'content': extract_content(blocks) if container is not None else None
+    }
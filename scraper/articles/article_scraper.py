@@ -4,49 +4,65 @@ NHK みんなでプラス 記事本文スクレイパー
 記事のタイトル、日付、URL、本文を取得してJSON形式で保存します
 """
 
-import requests
-from bs4 import BeautifulSoup
 import json
 import argparse
+import os
+import sys
 from typing import Dict, Optional
 
+# scraper/ 直下の共通モジュールを読み込めるようにする
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.html_parsing import ARTICLE_STRAINER, DEFAULT_PARSER, PARSER_BACKENDS, decode_html, make_soup
+from common.http_client import HTTPClient, get_default_client
+from common.page_fetcher import FetchedPage, PageFetcher
+from article_extractor import extract_article
+
 
 class NHKArticleScraper:
-    def __init__(self, url: str):
+    def __init__(
+        self,
+        url: str,
+        fetcher: Optional[PageFetcher] = None,
+        client: Optional[HTTPClient] = None,
+        parser: str = DEFAULT_PARSER,
+        targeted: bool = True
+    ):
+        """
+        Args:
+            url: 記事ページのURL
+            fetcher: ページ取得層（省略時は記事ごとに作成）
+            client: 共有HTTPクライアント（省略時はプロセス全体の共有クライアント）
+            parser: HTMLパーサーのバックエンド（html.parser / lxml / html5lib）
+            targeted: タイトル・日付・本文に必要な要素だけを解析するか
+        """
         self.url = url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.parser = parser
+        self.targeted = targeted
+        # 接続プールとレート制限はプロセス全体で共有する
+        self.client = client or get_default_client()
+        self.session = self.client.session
+        # 取得済みページを使い回す（存在確認と本文取得で二重にGETしない）
+        self.fetcher = fetcher or PageFetcher(self.client)
+
+    def fetch_page(self) -> FetchedPage:
+        """記事ページを取得（同じ実行中は1回だけGET）"""
+        return self.fetcher.fetch(self.url)
 
     def scrape_article(self) -> Optional[Dict]:
         """記事データを取得"""
         try:
-            response = self.session.get(self.url)
-            response.raise_for_status()
-            response.encoding = response.apparent_encoding
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # タイトルを取得
-            title = self.get_title(soup)
+            page = self.fetch_page()
+            page.raise_for_status()
             
-            # 日付を取得
-            date = self.get_date(soup)
+            soup = page.parse(self.parser, ARTICLE_STRAINER if self.targeted else None)
             
-            # 本文を取得
-            content = self.get_content(soup)
+            article = build_article(self.url, soup)
             
-            if not title or not content:
+            if not article:
                 print("記事データの取得に失敗しました")
                 return None
             
-            return {
-                'title': title,
-                'date': date,
-                'url': self.url,
-                'content': content
-            }
+            return article
             
         except Exception as e:
             print(f"記事の取得中にエラーが発生しました: {e}")
@@ -178,6 +194,48 @@ class NHKArticleScraper:
             return None
 
 
+def build_article(url: str, soup) -> Optional[Dict]:
+    """解析済みの記事ページから記事データを組み立てる（タイトルか本文がなければ None）"""
+    # タイトル・日付・本文をツリーの1回の走査でまとめて取得
+    # （get_title / get_date / get_content と同じ結果）
+    extracted = extract_article(soup)
+    title = extracted['title']
+    date = extracted['date']
+    content = extracted['content']
+    
+    if not title or not content:
+        return None
+    
+    return {
+        'title': title,
+        'date': date,
+        'url': url,
+        'content': content
+    }
+
+
+def parse_article_html(
+    url: str,
+    body: bytes,
+    encoding: Optional[str] = None,
+    parser: str = DEFAULT_PARSER,
+    targeted: bool = True
+) -> Optional[Dict]:
+    """
+    取得済みのHTML（バイト列）から記事データを抽出
+    プロセスプールの解析ワーカーからも呼び出せるよう、モジュールのトップレベルに置く
+
+    Args:
+        url: 記事ページのURL
+        body: HTMLのバイト列
+        encoding: 文字コード（省略時は本文から推定）
+        parser: HTMLパーサーのバックエンド
+        targeted: 必要な要素だけを解析するか
+    """
+    soup = make_soup(decode_html(body, encoding), parser, ARTICLE_STRAINER if targeted else None)
+    return build_article(url, soup)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='NHK みんなでプラス 記事本文スクレイパー'
@@ -196,6 +254,12 @@ def main():
         action='store_true',
         help='整形されたJSONを出力'
     )
+    parser.add_argument(
+        '--parser',
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_PARSER,
+        help=f'HTMLパーサー（デフォルト: {DEFAULT_PARSER}）'
+    )
     
     args = parser.parse_args()
     
@@ -203,7 +267,7 @@ def main():
     print()
     
     # スクレイパーを初期化
-    scraper = NHKArticleScraper(args.url)
+    scraper = NHKArticleScraper(args.url, parser=args.parser)
     
     # 記事を取得
     article = scraper.scrape_article()
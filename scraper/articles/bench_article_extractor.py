@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+記事抽出のマイクロベンチマーク
+保存済みの記事ページ（HTML）に対して、従来の get_title / get_date / get_content と
+1パス抽出器 extract_article の処理時間を比較し、結果が一致するかも確認します
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from article_extractor import extract_article
+from article_scraper import NHKArticleScraper
+
+# scraper/ 直下の共通モジュールを読み込めるようにする
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.html_parsing import ARTICLE_STRAINER, DEFAULT_PARSER, PARSER_BACKENDS, make_soup
+from common.http_client import get_default_client
+
+
+def extract_with_methods(scraper: NHKArticleScraper, soup) -> Dict[str, Optional[str]]:
+    """従来のメソッドで抽出"""
+    return {
+        'title': scraper.get_title(soup),
+        'date': scraper.get_date(soup),
+        'content': scraper.get_content(soup)
+    }
+
+
+def time_extractor(func: Callable, soups: List, repeat: int) -> float:
+    """全ページを repeat 回抽出したときの1ページあたりの平均時間（秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for soup in soups:
+            func(soup)
+    return (time.perf_counter() - start) / (repeat * len(soups))
+
+
+def save_pages(urls: List[str], save_dir: str) -> List[str]:
+    """記事ページを取得してHTMLとして保存"""
+    os.makedirs(save_dir, exist_ok=True)
+    client = get_default_client()
+    paths = []
+    for url in urls:
+        response = client.get(url)
+        if response.status_code != 200:
+            print(f"⚠️  HTTP {response.status_code}: {url} - スキップします")
+            continue
+        path = os.path.join(save_dir, os.path.basename(url))
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        paths.append(path)
+        print(f"📄 保存: {path}")
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='記事抽出のマイクロベンチマーク（従来メソッド vs 1パス抽出）'
+    )
+    parser.add_argument(
+        'pages',
+        nargs='*',
+        help='保存済みの記事ページ（HTMLファイルまたはglobパターン）'
+    )
+    parser.add_argument(
+        '--urls',
+        nargs='*',
+        default=[],
+        help='取得してベンチマークに使う記事ページのURL'
+    )
+    parser.add_argument(
+        '--save-dir',
+        default='bench_pages',
+        help='--urls で取得したページの保存先（デフォルト: bench_pages）'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=20,
+        help='計測の繰り返し回数（デフォルト: 20）'
+    )
+    parser.add_argument(
+        '--parser',
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_PARSER,
+        help=f'HTMLパーサー（デフォルト: {DEFAULT_PARSER}）'
+    )
+    parser.add_argument(
+        '--full-parse',
+        action='store_true',
+        help='必要な要素に絞らず、文書全体を解析する'
+    )
+
+    args = parser.parse_args()
+
+    paths = []
+    for pattern in args.pages:
+        paths.extend(sorted(glob.glob(pattern)) or [pattern])
+    if args.urls:
+        paths.extend(save_pages(args.urls, args.save_dir))
+
+    if not paths:
+        parser.error('記事ページのHTMLファイルか --urls を指定してください')
+
+    strainer = None if args.full_parse else ARTICLE_STRAINER
+    soups = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            soups.append(make_soup(f.read(), args.parser, strainer))
+
+    # 結果が一致するかを確認
+    scraper = NHKArticleScraper('')
+    mismatches = 0
+    for path, soup in zip(paths, soups):
+        if extract_with_methods(scraper, soup) != extract_article(soup):
+            print(f"❌ 結果が一致しません: {path}")
+            mismatches += 1
+
+    legacy = time_extractor(lambda soup: extract_with_methods(scraper, soup), soups, args.repeat)
+    single_pass = time_extractor(extract_article, soups, args.repeat)
+
+    print("=" * 60)
+    print("記事抽出ベンチマーク")
+    print("=" * 60)
+    print(f"ページ数: {len(soups)}件（{args.repeat}回繰り返し、パーサー: {args.parser}）")
+    print(f"従来メソッド: {legacy * 1000:.3f}ms/ページ")
+    print(f"1パス抽出:   {single_pass * 1000:.3f}ms/ページ")
+    print(f"高速化:       {legacy / single_pass:.2f}倍")
+    print(f"結果の一致:   {len(soups) - mismatches}/{len(soups)}件")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
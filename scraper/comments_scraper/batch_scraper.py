@@ -6,11 +6,201 @@ NHK みんなでプラス コメント一括スクレイパー
 
 import json
 import os
+import sys
 import time
-from nhk_comment_scraper import NHKCommentScraper
+from functools import partial
+from typing import Dict, List, Optional
+from nhk_comment_scraper import EXTRACTORS, NHKCommentScraper, parse_comment_pages
 
+# scraper/ 直下の共通モジュールを読み込めるようにする
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.async_engine import run_concurrently
+from common.http_cache import DEFAULT_CACHE_DIR, HTTPCache
+from common.html_parsing import DEFAULT_PARSER, PARSER_BACKENDS
+from common.http_client import configure_default_client, get_default_client
+from common.pipeline import run_pipeline
 
-def scrape_article_range(start_id: int, end_id: int, output_dir: str = "output", base_category: str = "0026"):
+
+def build_comments_url(base_category: str, article_id: int) -> str:
+    """記事IDからコメントページ（1ページ目）のURLを生成"""
+    topic_id = f"{base_category}_{article_id:03d}"
+    return f"https://www.nhk.or.jp/minplus/{base_category}/comments/{topic_id}/index.html"
+
+
+def scrape_single_topic(
+    article_id: int,
+    end_id: int,
+    category_output_dir: str,
+    base_category: str,
+    incremental: bool = False,
+    page_concurrency: int = 4,
+    parser: str = DEFAULT_PARSER,
+    targeted: bool = True,
+    extractor: str = 'soup'
+) -> str:
+    """
+    1件の記事のコメントを取得して保存
+
+    Args:
+        incremental: 保存済みのコメントがあれば新着分だけを取得してマージする
+        page_concurrency: 1記事内でコメントページを同時に取得する数
+        parser: HTMLパーサーのバックエンド
+        targeted: 必要な要素だけを解析するか
+        extractor: コメントの抽出方式（soup / stream）
+
+    Returns:
+        'success' / 'unchanged' / 'skip' / 'error'
+    """
+    article_num = f"{article_id:03d}"
+    topic_id = f"{base_category}_{article_num}"
+    
+    # URL生成
+    url = build_comments_url(base_category, article_id)
+    
+    # 出力ファイル名
+    output_file = os.path.join(category_output_dir, f"{topic_id}.json")
+    
+    # 並行実行時に他の記事のログと混ざらないよう、まとめて出力する
+    log = [
+        f"[{article_id}/{end_id}] {topic_id} を処理中...",
+        f"  URL: {url}",
+    ]
+    
+    try:
+        # スクレイパーを初期化
+        scraper = NHKCommentScraper(
+            url, page_concurrency=page_concurrency, parser=parser, targeted=targeted,
+            extractor=extractor
+        )
+        
+        # まず最初のページにアクセスして存在確認（取得したページはコメントの取得でも使い回す）
+        page = scraper.fetch_page(url)
+        
+        if page.status_code == 404:
+            log.append(f"  ⚠️  ページが見つかりません（404）- スキップします")
+            return 'skip'
+        elif page.status_code != 200:
+            log.append(f"  ⚠️  エラー（HTTP {page.status_code}）- スキップします")
+            return 'skip'
+        
+        # 差分取得モードでは前回保存したコメントを読み込む
+        existing = None
+        if incremental and os.path.exists(output_file):
+            with open(output_file, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+        
+        # コメントを取得
+        comments = scraper.scrape_all_comments(existing)
+        
+        if existing is not None and comments is existing:
+            log.append(f"  ⏭️  変更なし: {len(comments)}件（保存済み）")
+            return 'unchanged'
+        
+        if len(comments) == 0:
+            log.append(f"  ⚠️  コメントが0件 - スキップします")
+            return 'skip'
+        
+        # JSONファイルに保存
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(comments, f, ensure_ascii=False, indent=2)
+        
+        log.append(f"  ✅ 成功: {len(comments)}件のコメントを保存しました")
+        log.append(f"  📄 保存先: {output_file}")
+        return 'success'
+        
+    except Exception as e:
+        log.append(f"  ❌ エラーが発生しました: {e}")
+        return 'error'
+    
+    finally:
+        print('\n'.join(log) + '\n', flush=True)
+
+
+def run_comment_pipeline(
+    start_id: int,
+    end_id: int,
+    category_output_dir: str,
+    base_category: str,
+    fetch_workers: int = 8,
+    parse_workers: Optional[int] = None,
+    page_concurrency: int = 4,
+    parser: str = DEFAULT_PARSER,
+    targeted: bool = True,
+    extractor: str = 'soup'
+) -> Dict[str, int]:
+    """
+    取得（スレッド）・解析（プロセスプール）・保存を分けたパイプラインでコメントを取得
+    記事ごとに全ページを取得してから、まとめて解析プロセスに渡します
+
+    Args:
+        fetch_workers: 取得スレッド数（同時に処理する記事数）
+        parse_workers: 解析プロセス数（省略時はCPUコア数）
+        page_concurrency: 1記事内でコメントページを同時に取得する数
+        parser: HTMLパーサーのバックエンド
+        targeted: 必要な要素だけを解析するか
+        extractor: コメントの抽出方式（soup / stream）
+
+    Returns:
+        ステータスごとの件数
+    """
+    def fetch(article_id: int):
+        topic_id = f"{base_category}_{article_id:03d}"
+        url = build_comments_url(base_category, article_id)
+        scraper = NHKCommentScraper(
+            url, page_concurrency=page_concurrency, parser=parser, targeted=targeted,
+            extractor=extractor
+        )
+        page = scraper.fetch_page(url)
+        
+        if page.status_code == 404:
+            print(f"[{article_id}/{end_id}] {topic_id}: ⚠️  ページが見つかりません（404）- スキップします", flush=True)
+            return 'skip', None
+        elif page.status_code != 200:
+            print(f"[{article_id}/{end_id}] {topic_id}: ⚠️  エラー（HTTP {page.status_code}）- スキップします", flush=True)
+            return 'skip', None
+        
+        # 1ページ目は取得済みのものを使い回す
+        bodies = scraper.fetch_raw_pages(scraper.get_pagination_urls(url))
+        return 'ok', (bodies,)
+    
+    def write(article_id: int, comments: List[Dict]) -> str:
+        topic_id = f"{base_category}_{article_id:03d}"
+        if len(comments) == 0:
+            print(f"[{article_id}/{end_id}] {topic_id}: ⚠️  コメントが0件 - スキップします", flush=True)
+            return 'skip'
+        
+        output_file = os.path.join(category_output_dir, f"{topic_id}.json")
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(comments, f, ensure_ascii=False, indent=2)
+        
+        print(f"[{article_id}/{end_id}] {topic_id}: ✅ {len(comments)}件のコメントを保存しました", flush=True)
+        return 'success'
+    
+    return run_pipeline(
+        range(start_id, end_id + 1),
+        fetch,
+        partial(parse_comment_pages, encoding=None, parser=parser, targeted=targeted, extractor=extractor),
+        write,
+        fetch_workers=fetch_workers,
+        parse_workers=parse_workers
+    )
+
+
+def scrape_article_range(
+    start_id: int,
+    end_id: int,
+    output_dir: str = "output",
+    base_category: str = "0026",
+    use_async: bool = False,
+    concurrency: int = 8,
+    incremental: bool = False,
+    page_concurrency: int = 4,
+    parser: str = DEFAULT_PARSER,
+    targeted: bool = True,
+    extractor: str = 'soup',
+    use_pipeline: bool = False,
+    parse_workers: Optional[int] = None
+):
     """
     指定された範囲の記事IDのコメントを取得
     
@@ -19,81 +209,55 @@ def scrape_article_range(start_id: int, end_id: int, output_dir: str = "output",
         end_id: 終了記事ID（例: 300）
         output_dir: 出力ディレクトリ
         base_category: カテゴリID（デフォルト: 0026）
+        use_async: 非同期エンジンで並行取得するか
+        concurrency: 非同期エンジンの同時実行数
+        incremental: 保存済みのコメント数と比較し、新着分だけを取得する
+        page_concurrency: 1記事内でコメントページを同時に取得する数
+        parser: HTMLパーサーのバックエンド
+        targeted: 必要な要素だけを解析するか
+        extractor: コメントの抽出方式（soup / stream）
+        use_pipeline: 取得と解析を分けたパイプラインで処理するか（取得スレッド数は concurrency）
+        parse_workers: パイプラインの解析プロセス数（省略時はCPUコア数）
     """
     # カテゴリごとのサブディレクトリを作成
     category_output_dir = os.path.join(output_dir, base_category)
     os.makedirs(category_output_dir, exist_ok=True)
     
-    success_count = 0
-    skip_count = 0
-    error_count = 0
-    
     print(f"=" * 60)
     print(f"コメント一括取得を開始します")
     print(f"対象: {base_category}_{start_id:03d} から {base_category}_{end_id:03d}")
     print(f"カテゴリ: {base_category}")
     print(f"出力先: {category_output_dir}/")
+    if use_pipeline:
+        print(f"モード: パイプライン（取得 {concurrency}スレッド、解析 {parse_workers or os.cpu_count()}プロセス）")
+    elif use_async:
+        print(f"モード: 非同期（同時実行数 {concurrency}）")
     print(f"=" * 60)
     print()
     
-    for article_id in range(start_id, end_id + 1):
-        article_num = f"{article_id:03d}"
-        topic_id = f"{base_category}_{article_num}"
-        
-        # URL生成
-        url = f"https://www.nhk.or.jp/minplus/{base_category}/comments/{topic_id}/index.html"
-        
-        # 出力ファイル名
-        output_file = os.path.join(category_output_dir, f"{topic_id}.json")
-        
-        print(f"[{article_id}/{end_id}] {topic_id} を処理中...")
-        print(f"  URL: {url}")
-        
-        try:
-            # スクレイパーを初期化
-            scraper = NHKCommentScraper(url)
-            
-            # まず最初のページにアクセスして存在確認
-            import requests
-            response = scraper.session.get(url)
-            
-            if response.status_code == 404:
-                print(f"  ⚠️  ページが見つかりません（404）- スキップします")
-                skip_count += 1
-                print()
-                continue
-            elif response.status_code != 200:
-                print(f"  ⚠️  エラー（HTTP {response.status_code}）- スキップします")
-                skip_count += 1
-                print()
-                continue
-            
-            # コメントを取得
-            comments = scraper.scrape_all_comments()
-            
-            if len(comments) == 0:
-                print(f"  ⚠️  コメントが0件 - スキップします")
-                skip_count += 1
-                print()
-                continue
-            
-            # JSONファイルに保存
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(comments, f, ensure_ascii=False, indent=2)
-            
-            print(f"  ✅ 成功: {len(comments)}件のコメントを保存しました")
-            print(f"  📄 保存先: {output_file}")
-            success_count += 1
+    def worker(article_id: int) -> str:
+        return scrape_single_topic(
+            article_id, end_id, category_output_dir, base_category, incremental, page_concurrency,
+            parser, targeted, extractor
+        )
+    
+    if use_pipeline:
+        counts = run_comment_pipeline(
+            start_id, end_id, category_output_dir, base_category,
+            fetch_workers=concurrency, parse_workers=parse_workers, page_concurrency=page_concurrency,
+            parser=parser, targeted=targeted, extractor=extractor
+        )
+    elif use_async:
+        counts = run_concurrently(range(start_id, end_id + 1), worker, concurrency=concurrency)
+    else:
+        counts = {}
+        for article_id in range(start_id, end_id + 1):
+            status = worker(article_id)
+            counts[status] = counts.get(status, 0) + 1
             
-        except Exception as e:
-            print(f"  ❌ エラーが発生しました: {e}")
-            error_count += 1
-        
-        print()
-        
-        # サーバーへの負荷を軽減するため、少し待機
-        if article_id < end_id:
-            time.sleep(1)  # 1秒待機
+            # サーバーへの負荷を軽減するため、少し待機
+            if article_id < end_id:
+                time.sleep(1)  # 1秒待機
     
     # 結果サマリー
     print()
@@ -101,10 +265,17 @@ def scrape_article_range(start_id: int, end_id: int, output_dir: str = "output",
     print("一括取得が完了しました")
     print("=" * 60)
     print(f"カテゴリ: {base_category}")
-    print(f"✅ 成功: {success_count}件")
-    print(f"⚠️  スキップ: {skip_count}件")
-    print(f"❌ エラー: {error_count}件")
+    print(f"✅ 成功: {counts.get('success', 0)}件")
+    if incremental:
+        print(f"⏭️  変更なし: {counts.get('unchanged', 0)}件")
+    print(f"⚠️  スキップ: {counts.get('skip', 0)}件")
+    print(f"❌ エラー: {counts.get('error', 0)}件")
     print(f"📁 出力先: {category_output_dir}/")
+    if counts.get('interrupted'):
+        print("⚠️  中断されたため、未処理の記事があります")
+    cache = get_default_client().cache
+    if cache is not None:
+        print(f"🗄️  HTTPキャッシュ: {cache.stats.summary()}")
     print("=" * 60)
 
 
@@ -136,12 +307,108 @@ if __name__ == '__main__':
         default='0026',
         help='カテゴリID（デフォルト: 0026）'
     )
+    parser.add_argument(
+        '--async',
+        dest='use_async',
+        action='store_true',
+        help='非同期エンジンで複数の記事を並行取得'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=8,
+        help='非同期エンジンの同時実行数（デフォルト: 8）'
+    )
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=2.0,
+        help='1ホストあたりの1秒間のリクエスト数（デフォルト: 2.0、0で無制限）'
+    )
+    parser.add_argument(
+        '--no-compress',
+        action='store_true',
+        help='圧縮転送（gzip/deflate）を要求しない'
+    )
+    parser.add_argument(
+        '--http-cache',
+        action='store_true',
+        help='ディスクキャッシュを使い、変更のないページは条件付きGET（304）で再利用'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=None,
+        help='HTTPキャッシュの保存先（デフォルト: scraper/.http_cache）'
+    )
+    parser.add_argument(
+        '--parser',
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_PARSER,
+        help=f'HTMLパーサー（デフォルト: {DEFAULT_PARSER}）'
+    )
+    parser.add_argument(
+        '--full-parse',
+        action='store_true',
+        help='必要な要素に絞らず、文書全体を解析する'
+    )
+    parser.add_argument(
+        '--extractor',
+        choices=EXTRACTORS,
+        default='soup',
+        help='コメントの抽出方式（soup: BeautifulSoup / stream: ツリーを作らない1パス抽出、デフォルト: soup）'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='保存済みのコメント数と比較し、新着コメントのあるページだけを取得'
+    )
+    parser.add_argument(
+        '--page-concurrency',
+        type=int,
+        default=4,
+        help='1記事内でコメントページを同時に取得する数（デフォルト: 4）'
+    )
+    parser.add_argument(
+        '--pipeline',
+        action='store_true',
+        help='取得（スレッド）と解析（プロセスプール）を分けたパイプラインで処理'
+    )
+    parser.add_argument(
+        '--parse-workers',
+        type=int,
+        default=None,
+        help='パイプラインの解析プロセス数（デフォルト: CPUコア数）'
+    )
     
     args = parser.parse_args()
     
+    if args.pipeline and args.incremental:
+        parser.error('--pipeline と --incremental は同時に指定できません')
+    
+    cache = None
+    if args.http_cache or args.cache_dir:
+        cache = HTTPCache(args.cache_dir or DEFAULT_CACHE_DIR)
+    
+    # 接続プールとレート制限をプロセス全体で共有する
+    configure_default_client(
+        rate=args.rate,
+        pool_size=max(args.concurrency * args.page_concurrency, 1),
+        compress=not args.no_compress,
+        cache=cache
+    )
+    
     scrape_article_range(
         start_id=args.start,
         end_id=args.end,
         output_dir=args.output_dir,
-        base_category=args.category
+        base_category=args.category,
+        use_async=args.use_async,
+        concurrency=args.concurrency,
+        incremental=args.incremental,
+        page_concurrency=args.page_concurrency,
+        parser=args.parser,
+        targeted=not args.full_parse,
+        extractor=args.extractor,
+        use_pipeline=args.pipeline,
+        parse_workers=args.parse_workers
     )
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+ツリーを構築しないコメント抽出器
+HTMLのバイト列を1回だけ走査し、<dl class="c-comment"> が閉じた時点でコメントを出力します
+（NHKCommentScraper.parse_comment と同じ結果を返します）
+"""
+
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+AGE_PATTERN = re.compile(r'(\d+代|19歳以下|70歳以上)')
+TOTAL_COUNT_PATTERN = re.compile(r'みんなのコメント[（(](\d+)件[)）]')
+
+# (タグ名, クラス名) → 取り出す項目
+FIELD_SELECTORS = {
+    ('div', 'c-comment__label'): 'type',
+    ('div', 'c-comment__name'): 'name',
+    ('div', 'c-comment__meta'): 'meta',
+    ('div', 'c-comment__date'): 'date',
+    ('dd', 'c-comment__body'): 'content',
+}
+
+# 終了タグを持たない要素
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+}
+
+# get_text() の対象にならない要素
+NON_TEXT_ELEMENTS = {'script', 'style'}
+
+
+def parse_age_gender(text: str) -> Tuple[Optional[str], Optional[str]]:
+    """年齢と性別を解析"""
+    age = None
+    gender = None
+
+    if text:
+        age_match = AGE_PATTERN.search(text)
+        if age_match:
+            age = age_match.group(1)
+
+        if '男性' in text:
+            gender = '男性'
+        elif '女性' in text:
+            gender = '女性'
+
+    return age, gender
+
+
+class CommentStreamParser(HTMLParser):
+    """イベント駆動でコメントを取り出すHTMLパーサー"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.total_count: Optional[int] = None
+        self._completed: List[Dict] = []
+
+        # 解析中のコメント
+        self._dl_depth = 0
+        self._fields: Dict[str, str] = {}
+        # 項目名 → [タグ名, 入れ子の深さ, テキスト片]
+        self._active: Dict[str, list] = {}
+
+        # 総コメント数の見出し
+        self._h2_depth = 0
+        self._h2_text: List[str] = []
+
+        # 1つのテキストノードが複数回に分けて届く場合があるため、タグの境界までためておく
+        self._text_run: List[str] = []
+        self._in_non_text = False
+
+    def pop_completed(self) -> List[Dict]:
+        """閉じ終わったコメントを取り出す"""
+        completed, self._completed = self._completed, []
+        return completed
+
+    def _flush_text(self):
+        if not self._text_run:
+            return
+        text = ''.join(self._text_run)
+        self._text_run = []
+
+        if self._h2_depth:
+            self._h2_text.append(text)
+
+        # get_text(strip=True) と同様に、テキストノードごとに前後の空白を除いて連結する
+        stripped = text.strip()
+        if stripped:
+            for state in self._active.values():
+                state[2].append(stripped)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if tag in VOID_ELEMENTS:
+            return
+        if tag in NON_TEXT_ELEMENTS:
+            self._in_non_text = True
+
+        classes = set()
+        for name, value in attrs:
+            if name == 'class' and value:
+                classes.update(value.split())
+
+        if tag == 'h2':
+            if self._h2_depth or self.total_count is None:
+                self._h2_depth += 1
+
+        if not self._dl_depth:
+            if tag == 'dl' and 'c-comment' in classes:
+                self._dl_depth = 1
+                self._fields = {}
+                self._active = {}
+            return
+
+        if tag == 'dl':
+            self._dl_depth += 1
+
+        for state in self._active.values():
+            if state[0] == tag:
+                state[1] += 1
+
+        for (field_tag, field_class), field in FIELD_SELECTORS.items():
+            if (tag == field_tag and field_class in classes
+                    and field not in self._fields and field not in self._active):
+                self._active[field] = [tag, 1, []]
+
+    def handle_startendtag(self, tag, attrs):
+        # <div/> のような自己終了タグは、空の要素として開始・終了を続けて処理する
+        self.handle_starttag(tag, attrs)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag in VOID_ELEMENTS:
+            return
+        if tag in NON_TEXT_ELEMENTS:
+            self._in_non_text = False
+
+        if tag == 'h2' and self._h2_depth:
+            self._h2_depth -= 1
+            if not self._h2_depth:
+                match = TOTAL_COUNT_PATTERN.search(''.join(self._h2_text))
+                if match:
+                    self.total_count = int(match.group(1))
+                self._h2_text = []
+
+        if not self._dl_depth:
+            return
+
+        for field, state in list(self._active.items()):
+            if state[0] == tag:
+                state[1] -= 1
+                if not state[1]:
+                    self._fields[field] = ''.join(state[2])
+                    del self._active[field]
+
+        if tag == 'dl':
+            self._dl_depth -= 1
+            if not self._dl_depth:
+                self._finish_comment()
+
+    def handle_comment(self, data):
+        self._flush_text()
+
+    def handle_data(self, data):
+        if self._in_non_text:
+            return
+        if self._dl_depth or self._h2_depth:
+            self._text_run.append(data)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+
+    def _finish_comment(self):
+        # 閉じられていない項目はそこまでのテキストで確定する
+        for field, state in self._active.items():
+            self._fields[field] = ''.join(state[2])
+        self._active = {}
+
+        fields = self._fields
+        name = fields.get('name')
+        content = fields.get('content')
+        if not name and not content:
+            return
+
+        age, gender = None, None
+        if 'meta' in fields:
+            age, gender = parse_age_gender(fields['meta'])
+
+        self._completed.append({
+            'type': fields.get('type'),
+            'name': name,
+            'age': age,
+            'gender': gender,
+            'date': fields.get('date'),
+            'content': content
+        })
+
+
+def iter_comments(
+    chunks: Iterable[bytes],
+    encoding: str = 'utf-8',
+    parser: Optional[CommentStreamParser] = None
+) -> Iterator[Dict]:
+    """
+    バイト列のチャンクからコメントを順に取り出す
+
+    Args:
+        chunks: HTMLのバイト列（分割されていてもよい）
+        encoding: 文字コード
+        parser: 使用するパーサー（総コメント数を参照したい場合に渡す）
+    """
+    parser = parser or CommentStreamParser()
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+        yield from parser.pop_completed()
+
+    parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    yield from parser.pop_completed()
+
+
+def extract_comments(body: bytes, encoding: str = 'utf-8', chunk_size: int = 64 * 1024) -> Tuple[List[Dict], int]:
+    """
+    1ページ分のHTMLからコメントと総コメント数を取り出す
+
+    Returns:
+        (コメントのリスト, 総コメント数（見出しがなければ0）)
+    """
+    parser = CommentStreamParser()
+    chunks = (body[start:start + chunk_size] for start in range(0, len(body), chunk_size))
+    comments = list(iter_comments(chunks, encoding, parser))
+    return comments, parser.total_count or 0
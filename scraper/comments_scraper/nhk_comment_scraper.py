@@ -4,23 +4,96 @@ NHK みんなでプラス コメントスクレイパー
 URLを引数にしてコメントをJSON形式で取得します
 """
 
-import requests
-from bs4 import BeautifulSoup
 import json
 import re
 import argparse
+import os
+import sys
 import time
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from urllib.parse import urljoin, urlparse, parse_qs
 
+# 1ページあたりのコメント数
+COMMENTS_PER_PAGE = 10
+
+# コメントの抽出方式（soup: BeautifulSoup のツリー / stream: ツリーを作らない1パス抽出）
+EXTRACTORS = ['soup', 'stream']
+
+# scraper/ 直下の共通モジュールを読み込めるようにする
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.html_parsing import (
+    COMMENT_STRAINER, DEFAULT_PARSER, PARSER_BACKENDS, decode_html, detect_encoding, make_soup
+)
+from common.http_client import HTTPClient, get_default_client
+from common.page_fetcher import FetchedPage, PageFetcher
+from comment_stream_parser import extract_comments
+
+
+class CommentPageError(Exception):
+    """コメントページの取得に、再試行しても失敗した"""
+
 
 class NHKCommentScraper:
-    def __init__(self, base_url: str):
+    def __init__(
+        self,
+        base_url: str,
+        fetcher: Optional[PageFetcher] = None,
+        client: Optional[HTTPClient] = None,
+        page_concurrency: int = 4,
+        max_retries: int = 3,
+        parser: str = DEFAULT_PARSER,
+        targeted: bool = True,
+        extractor: str = 'soup'
+    ):
+        """
+        Args:
+            base_url: コメントページ（1ページ目）のURL
+            fetcher: ページ取得層（省略時は記事ごとに作成）
+            client: 共有HTTPクライアント（省略時はプロセス全体の共有クライアント）
+            page_concurrency: 1記事内でコメントページを同時に取得する数
+            max_retries: コメントページの取得に失敗した場合の再試行回数
+            parser: HTMLパーサーのバックエンド（html.parser / lxml / html5lib）
+            targeted: コメント・総コメント数の見出し・ページネーションだけを解析するか
+            extractor: コメントの抽出方式（soup / stream）
+        """
+        if extractor not in EXTRACTORS:
+            raise ValueError(f"未対応の抽出方式です: {extractor}（{', '.join(EXTRACTORS)} から選択してください）")
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.parser = parser
+        self.targeted = targeted
+        self.extractor = extractor
+        # ページURL → (コメント, 総コメント数)。stream 抽出の結果を使い回す
+        self._stream_results: Dict[str, Tuple[List[Dict], int]] = {}
+        self.page_concurrency = max(1, page_concurrency)
+        self.max_retries = max_retries
+        # 接続プールとレート制限はプロセス全体で共有する
+        self.client = client or get_default_client()
+        self.session = self.client.session
+        # 取得済みページを使い回す（存在確認・総コメント数・1ページ目で同じURLを何度もGETしない）
+        self.fetcher = fetcher or PageFetcher(self.client)
+
+    def fetch_page(self, url: str) -> FetchedPage:
+        """ページを取得（同じ実行中は1回だけGET）"""
+        return self.fetcher.fetch(url)
+
+    def parse_page(self, page: FetchedPage):
+        """設定されたパーサーでページを解析"""
+        return page.parse(self.parser, COMMENT_STRAINER if self.targeted else None)
+
+    def stream_extract(self, page: FetchedPage) -> Tuple[List[Dict], int]:
+        """ツリーを作らずにページからコメントと総コメント数を取り出す（ページごとに1回だけ）"""
+        result = self._stream_results.get(page.url)
+        if result is None:
+            result = extract_comments(page.response.content, page.encoding)
+            self._stream_results[page.url] = result
+        return result
+
+    def page_total_count(self, page: FetchedPage) -> int:
+        """設定された抽出方式でページから総コメント数を取得"""
+        if self.extractor == 'stream':
+            return self.stream_extract(page)[1]
+        return self.get_total_comment_count(self.parse_page(page))
 
     def parse_age_gender(self, text: str) -> tuple[Optional[str], Optional[str]]:
         """年齢と性別を解析"""
@@ -87,28 +160,78 @@ class NHKCommentScraper:
     def get_page_comments(self, url: str) -> List[Dict]:
         """指定されたページのコメントを取得"""
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            response.encoding = response.apparent_encoding
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # コメントリストを取得（<dl class="c-comment">タグ）
-            comment_elements = soup.find_all('dl', class_='c-comment')
-            
-            comments = []
-            for comment_elem in comment_elements:
-                comment_data = self.parse_comment(comment_elem)
-                if comment_data:
-                    comments.append(comment_data)
-            
-            return comments
+            return self.fetch_page_comments(url)
         except Exception as e:
             print(f"ページの取得中にエラーが発生しました: {e}")
             import traceback
             traceback.print_exc()
             return []
 
+    def fetch_page_comments(self, url: str) -> List[Dict]:
+        """指定されたページのコメントを取得（失敗時は例外を送出）"""
+        page = self.fetch_page(url)
+        page.raise_for_status()
+        
+        if self.extractor == 'stream':
+            return list(self.stream_extract(page)[0])
+        
+        return self.extract_page_comments(self.parse_page(page))
+
+    def extract_page_comments(self, soup) -> List[Dict]:
+        """解析済みのページからコメントを取り出す"""
+        # コメントリストを取得（<dl class="c-comment">タグ）
+        comment_elements = soup.find_all('dl', class_='c-comment')
+        
+        comments = []
+        for comment_elem in comment_elements:
+            comment_data = self.parse_comment(comment_elem)
+            if comment_data:
+                comments.append(comment_data)
+        
+        return comments
+
+    def fetch_page_with_retry(self, url: str) -> FetchedPage:
+        """
+        ページを取得（失敗時は間隔を空けて再試行）
+
+        Raises:
+            CommentPageError: 再試行しても取得できなかった場合
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                page = self.fetch_page(url)
+                page.raise_for_status()
+                return page
+            except Exception as e:
+                # 失敗したレスポンスを使い回さないよう、取得済みページから外す
+                self.fetcher.discard(url)
+                if attempt == self.max_retries:
+                    raise CommentPageError(f"{url} の取得に失敗しました: {e}") from e
+                wait = 2 ** attempt
+                print(f"  ⚠️  {url} の取得に失敗しました（{e}）- {wait}秒後に再試行します")
+                time.sleep(wait)
+
+    def fetch_page_comments_with_retry(self, url: str) -> List[Dict]:
+        """
+        指定されたページのコメントを取得（取得に失敗した場合は再試行）
+
+        Raises:
+            CommentPageError: 再試行しても取得できなかった場合
+        """
+        self.fetch_page_with_retry(url)
+        return self.fetch_page_comments(url)
+
+    def fetch_raw_pages(self, page_urls: List[str]) -> List[bytes]:
+        """
+        ページURLのリストを並行して取得し、解析せずに本文のバイト列をページ順に返す
+        （パイプラインモードで、解析を別プロセスに任せる場合に使用）
+
+        Raises:
+            CommentPageError: 再試行しても取得できないページがあった場合
+        """
+        with ThreadPoolExecutor(max_workers=min(self.page_concurrency, max(len(page_urls), 1))) as executor:
+            return [page.response.content for page in executor.map(self.fetch_page_with_retry, page_urls)]
+
     def get_total_comment_count(self, soup) -> int:
         """総コメント数を取得"""
         try:
@@ -128,18 +251,15 @@ class NHKCommentScraper:
     def get_pagination_urls(self, url: str) -> List[str]:
         """ページネーションのURLリストを取得"""
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            response.encoding = response.apparent_encoding
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
+            page = self.fetch_page(url)
+            page.raise_for_status()
             
             # 総コメント数を取得
-            total_comments = self.get_total_comment_count(soup)
+            total_comments = self.page_total_count(page)
             
             if total_comments > 0:
                 # 1ページあたり10件として総ページ数を計算
-                comments_per_page = 10
+                comments_per_page = COMMENTS_PER_PAGE
                 total_pages = (total_comments + comments_per_page - 1) // comments_per_page  # 切り上げ
                 
                 print(f"総コメント数: {total_comments}件")
@@ -161,6 +281,7 @@ class NHKCommentScraper:
                 # 総コメント数が取得できない場合は、従来の方法でページネーションを取得
                 print("総コメント数が取得できませんでした。表示されているページのみ取得します。")
                 
+                soup = self.parse_page(page)
                 pagination = None
                 for nav in soup.find_all('nav'):
                     nav_links = nav.find_all('a')
@@ -190,31 +311,143 @@ class NHKCommentScraper:
             traceback.print_exc()
             return [url]
 
-    def scrape_all_comments(self) -> List[Dict]:
-        """全ページのコメントを取得"""
+    def scrape_all_comments(self, existing: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        全ページのコメントを取得
+
+        Args:
+            existing: 前回保存したコメント。指定すると差分取得モードになり、
+                総コメント数が変わっていなければ1ページ目以外を取得しません
+        """
+        if existing is not None:
+            comments = self.scrape_new_comments(existing)
+            if comments is not None:
+                return comments
+            print("差分取得できなかったため、全ページを取得します")
+        
         print(f"コメントの取得を開始します: {self.base_url}")
         
         # ページネーションURLを取得
         page_urls = self.get_pagination_urls(self.base_url)
         print(f"取得対象ページ数: {len(page_urls)}ページ")
         
+        return self._collect_comments(page_urls)
+
+    def scrape_new_comments(self, existing: List[Dict]) -> Optional[List[Dict]]:
+        """
+        前回保存したコメントとの差分だけを取得してマージ
+
+        新しいコメントは先頭のページに追加されるため、増えた件数ぶんのページ
+        （境界をまたぐ分として+1ページ）だけを取得します
+
+        Returns:
+            マージ後のコメント。差分取得できない場合（件数が減った、総コメント数が
+            読めない、差分ページに新着が収まっていない）は None
+        """
+        print(f"コメントの差分取得を開始します: {self.base_url}")
+        
+        page = self.fetch_page(self.base_url)
+        page.raise_for_status()
+        total_comments = self.page_total_count(page)
+        
+        if total_comments == 0 or total_comments < len(existing):
+            return None
+        
+        if total_comments == len(existing):
+            print(f"総コメント数に変化なし（{total_comments}件）- 取得をスキップします")
+            return existing
+        
+        new_count = total_comments - len(existing)
+        pages_needed = (new_count + COMMENTS_PER_PAGE - 1) // COMMENTS_PER_PAGE + 1
+        page_urls = self.get_pagination_urls(self.base_url)[:pages_needed]
+        print(f"新着: {new_count}件（{len(page_urls)}ページを取得）")
+        
+        fresh = self._collect_comments(page_urls)
+        merged = merge_new_comments(fresh, existing)
+        
+        if len(merged) != total_comments:
+            return None
+        
+        return merged
+
+    def _collect_comments(self, page_urls: List[str]) -> List[Dict]:
+        """
+        ページURLのリストを並行して取得し、ページ順にコメントを連結
+
+        同時取得数は page_concurrency まで。サーバーへの負荷は共有HTTPクライアントの
+        レート制限で調整します
+
+        Raises:
+            CommentPageError: 再試行しても取得できないページがあった場合
+        """
         all_comments = []
         
-        for i, page_url in enumerate(page_urls, 1):
-            print(f"ページ {i}/{len(page_urls)} を処理中...")
-            comments = self.get_page_comments(page_url)
-            all_comments.extend(comments)
-            print(f"  {len(comments)} 件のコメントを取得")
-            
-            # サーバーへの負荷を軽減するため、各ページ取得後に少し待機
-            # 最後のページの後は待機不要
-            if i < len(page_urls):
-                time.sleep(0.5)  # 0.5秒待機
+        with ThreadPoolExecutor(max_workers=min(self.page_concurrency, max(len(page_urls), 1))) as executor:
+            # map は入力順に結果を返すので、ページの順序は保たれる
+            results = executor.map(self.fetch_page_comments_with_retry, page_urls)
+            for i, comments in enumerate(results, 1):
+                print(f"ページ {i}/{len(page_urls)}: {len(comments)} 件のコメントを取得")
+                all_comments.extend(comments)
         
         print(f"\n合計 {len(all_comments)} 件のコメントを取得しました")
         return all_comments
 
 
+# 解析プロセスごとに使い回すスクレイパー（parse_comment を呼ぶためだけに使う）
+_parse_scraper: Optional[NHKCommentScraper] = None
+
+
+def parse_comment_pages(
+    bodies: List[bytes],
+    encoding: Optional[str] = None,
+    parser: str = DEFAULT_PARSER,
+    targeted: bool = True,
+    extractor: str = 'soup'
+) -> List[Dict]:
+    """
+    取得済みのコメントページ（HTMLのバイト列）からコメントをページ順に取り出す
+    プロセスプールの解析ワーカーからも呼び出せるよう、モジュールのトップレベルに置く
+
+    Args:
+        bodies: 各ページのHTMLのバイト列
+        encoding: 文字コード（省略時は本文から推定）
+        parser: HTMLパーサーのバックエンド
+        targeted: 必要な要素だけを解析するか
+        extractor: コメントの抽出方式（soup / stream）
+    """
+    global _parse_scraper
+    all_comments = []
+    
+    for body in bodies:
+        if extractor == 'stream':
+            comments, _ = extract_comments(body, encoding or detect_encoding(body))
+        else:
+            if _parse_scraper is None:
+                _parse_scraper = NHKCommentScraper('')
+            soup = make_soup(decode_html(body, encoding), parser, COMMENT_STRAINER if targeted else None)
+            comments = _parse_scraper.extract_page_comments(soup)
+        all_comments.extend(comments)
+    
+    return all_comments
+
+
+def comment_key(comment: Dict) -> tuple:
+    """コメントの同一性を判定するキー"""
+    return (comment.get('type'), comment.get('name'), comment.get('date'), comment.get('content'))
+
+
+def merge_new_comments(fresh: List[Dict], existing: List[Dict]) -> List[Dict]:
+    """新しく取得したコメントのうち未保存のものを、既存のコメントの先頭に重複なく追加"""
+    seen = {comment_key(c) for c in existing}
+    new_comments = []
+    for comment in fresh:
+        key = comment_key(comment)
+        if key not in seen:
+            seen.add(key)
+            new_comments.append(comment)
+    return new_comments + existing
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='NHK みんなでプラス コメントスクレイパー'
@@ -233,14 +466,37 @@ def main():
         action='store_true',
         help='整形されたJSONを出力'
     )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='出力ファイルが既にある場合、新着コメントだけを取得してマージ'
+    )
+    parser.add_argument(
+        '--parser',
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_PARSER,
+        help=f'HTMLパーサー（デフォルト: {DEFAULT_PARSER}）'
+    )
+    parser.add_argument(
+        '--extractor',
+        choices=EXTRACTORS,
+        default='soup',
+        help='コメントの抽出方式（soup: BeautifulSoup / stream: ツリーを作らない1パス抽出、デフォルト: soup）'
+    )
     
     args = parser.parse_args()
     
     # スクレイパーを初期化
-    scraper = NHKCommentScraper(args.url)
+    scraper = NHKCommentScraper(args.url, parser=args.parser, extractor=args.extractor)
+    
+    # 差分取得モードでは前回の出力を読み込む
+    existing = None
+    if args.incremental and os.path.exists(args.output):
+        with open(args.output, 'r', encoding='utf-8') as f:
+            existing = json.load(f)
     
     # コメントを取得
-    comments = scraper.scrape_all_comments()
+    comments = scraper.scrape_all_comments(existing)
     
     # JSONファイルに保存
     with open(args.output, 'w', encoding='utf-8') as f:
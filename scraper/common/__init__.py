@@ -0,0 +1,3 @@
+"""
+記事スクレイパー・コメントスクレイパーで共通して使うモジュール群
+"""
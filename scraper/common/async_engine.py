@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+非同期クロールエンジン
+トピックIDごとの取得処理を、同時実行数の上限のもとで並行実行します
+（ホストごとのレート制限は共有HTTPクライアントがリクエスト単位で行います）
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable
+
+
+async def _run_jobs(
+    article_ids: Iterable[int],
+    worker: Callable[[int], str],
+    concurrency: int
+) -> Dict[str, int]:
+    loop = asyncio.get_running_loop()
+    # ワーカーは requests を使った同期処理なので、スレッドプールで実行する
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    counts: Dict[str, int] = {}
+
+    async def run_one(article_id: int):
+        async with semaphore:
+            try:
+                status = await loop.run_in_executor(executor, worker, article_id)
+            except Exception as e:
+                print(f"  ❌ {article_id} の処理中にエラーが発生しました: {e}")
+                status = 'error'
+            counts[status] = counts.get(status, 0) + 1
+
+    try:
+        await asyncio.gather(*(run_one(article_id) for article_id in article_ids))
+    finally:
+        executor.shutdown(wait=True)
+
+    return counts
+
+
+def run_concurrently(
+    article_ids: Iterable[int],
+    worker: Callable[[int], str],
+    concurrency: int = 8
+) -> Dict[str, int]:
+    """
+    トピックIDごとの処理を並行実行
+
+    Args:
+        article_ids: 処理する記事IDのリスト
+        worker: 記事IDを受け取り 'success' / 'skip' / 'error' を返す関数
+        concurrency: 同時実行数の上限
+
+    Returns:
+        ステータスごとの件数
+    """
+    return asyncio.run(_run_jobs(list(article_ids), worker, max(1, concurrency)))
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+HTMLパーサーの切り替えと対象を絞った解析
+BeautifulSoup のバックエンド（html.parser / lxml / html5lib）を選択し、
+SoupStrainer で必要な部分木だけを構築します
+"""
+
+from typing import Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.compat import chardet
+
+# 選択できるパーサー
+PARSER_BACKENDS = ['html.parser', 'lxml', 'html5lib']
+DEFAULT_PARSER = 'html.parser'
+
+# 記事ページで使う要素（タイトル・日付・本文のコンテナ）
+ARTICLE_STRAINER = SoupStrainer(['main', 'article', 'time', 'title', 'h1'])
+
+# コメントページで使う要素（コメント本体、総コメント数の見出し、ページネーション）
+COMMENT_STRAINER = SoupStrainer(['dl', 'h2', 'nav'])
+
+
+def make_soup(markup, parser: str = DEFAULT_PARSER, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """
+    HTMLを解析してツリーを構築
+
+    Args:
+        markup: HTML文字列
+        parser: パーサーのバックエンド
+        parse_only: 構築する要素を絞る SoupStrainer（None で文書全体）
+    """
+    if parser not in PARSER_BACKENDS:
+        raise ValueError(f"未対応のパーサーです: {parser}（{', '.join(PARSER_BACKENDS)} から選択してください）")
+    # html5lib は parse_only に対応していないため、文書全体を構築する
+    if parser == 'html5lib':
+        parse_only = None
+    return BeautifulSoup(markup, parser, parse_only=parse_only)
+
+
+def decode_html(body: bytes, encoding: Optional[str] = None) -> str:
+    """
+    HTMLのバイト列をデコード
+
+    Args:
+        body: HTMLのバイト列
+        encoding: 文字コード（省略時は requests の apparent_encoding と同じ方法で推定）
+    """
+    return str(body, encoding or detect_encoding(body), errors='replace')
+
+
+def detect_encoding(body: bytes) -> str:
+    """本文から文字コードを推定（requests の apparent_encoding と同じ方法）"""
+    return chardet.detect(body)['encoding'] or 'utf-8'
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+ディスク上のHTTPレスポンスキャッシュ
+URLをキーに本文と ETag / Last-Modified を保存し、再取得時は条件付きGETを送信します
+（304 Not Modified の場合はキャッシュから応答を組み立てます）
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# scraper/.http_cache/
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.http_cache')
+
+# キャッシュに保存するレスポンスヘッダー
+STORED_HEADERS = ['Content-Type', 'ETag', 'Last-Modified']
+
+
+class CacheStats:
+    """キャッシュのヒット数・ミス数・節約バイト数"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    def record_hit(self, size: int):
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += size
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def summary(self) -> str:
+        """実行サマリー用の1行表示"""
+        return (f"ヒット {self.hits}件 / ミス {self.misses}件 / "
+                f"節約 {self.bytes_saved / 1024:.1f}KB")
+
+
+class HTTPCache:
+    """URLをキーとした永続レスポンスキャッシュ"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.stats = CacheStats()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        directory = os.path.join(self.cache_dir, key[:2])
+        return os.path.join(directory, f"{key}.body"), os.path.join(directory, f"{key}.meta.json")
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """キャッシュ済みのメタ情報を取得（なければ None）"""
+        body_path, meta_path = self._paths(url)
+        if not (os.path.exists(body_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, meta: Dict) -> Dict[str, str]:
+        """条件付きGET用のヘッダー"""
+        headers = {}
+        stored = CaseInsensitiveDict(meta.get('headers', {}))
+        if stored.get('ETag'):
+            headers['If-None-Match'] = stored['ETag']
+        if stored.get('Last-Modified'):
+            headers['If-Modified-Since'] = stored['Last-Modified']
+        return headers
+
+    def load_response(self, url: str, meta: Dict) -> requests.Response:
+        """キャッシュから 200 のレスポンスを組み立てる（ヒットとして記録）"""
+        body_path, _ = self._paths(url)
+        with open(body_path, 'rb') as f:
+            body = f.read()
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = url
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response._content = body
+        response.from_cache = True
+
+        self.stats.record_hit(len(body))
+        return response
+
+    def store(self, url: str, response: requests.Response):
+        """レスポンスを保存（ミスとして記録）。検証子のない 200 以外は保存しない"""
+        self.stats.record_miss()
+
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        if response.status_code != 200 or not ('ETag' in headers or 'Last-Modified' in headers):
+            return
+
+        body_path, meta_path = self._paths(url)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+
+        # 書き込み途中のファイルを読まないよう、一時ファイルに書いてから置き換える
+        tmp_body = f"{body_path}.{threading.get_ident()}.tmp"
+        with open(tmp_body, 'wb') as f:
+            f.write(response.content)
+        os.replace(tmp_body, body_path)
+
+        tmp_meta = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'headers': headers}, f, ensure_ascii=False)
+        os.replace(tmp_meta, meta_path)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+プロセス全体で共有するHTTPクライアント
+keep-alive の接続プールと、ホストごとのトークンバケットによるレート制限を提供します
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from common.http_cache import HTTPCache
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+class TokenBucket:
+    """スレッドセーフなトークンバケット"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate: 1秒あたりに補充するトークン数（0以下で無制限）
+            burst: バケットの容量（連続して許容するリクエスト数）
+        """
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """トークンを1つ取得（足りない場合は補充されるまで待機）"""
+        if self.rate <= 0:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # 先にトークンを予約し、不足分だけロックの外で待機する
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+
+        if wait > 0:
+            time.sleep(wait)
+
+
+class HTTPClient:
+    """接続プールとホストごとのレート制限を持つHTTPクライアント"""
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: int = 1,
+        pool_size: int = 16,
+        compress: bool = True,
+        timeout: float = 30,
+        cache: Optional[HTTPCache] = None
+    ):
+        """
+        Args:
+            rate: 1ホストあたりの1秒間のリクエスト数（0以下で無制限）
+            burst: 1ホストあたりの連続リクエスト許容数
+            pool_size: 1ホストあたりに保持するkeep-alive接続数
+            compress: 圧縮転送（gzip/deflate）を要求するか
+            timeout: リクエストのタイムアウト（秒）
+            cache: 条件付きGETに使うディスクキャッシュ（None でキャッシュしない）
+        """
+        self.rate = rate
+        self.burst = burst
+        self.timeout = timeout
+        self.cache = cache
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': DEFAULT_USER_AGENT,
+            'Accept-Encoding': 'gzip, deflate' if compress else 'identity'
+        })
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket_for(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """レート制限に従ってGETリクエストを送信（キャッシュ有効時は条件付きGET）"""
+        self._bucket_for(url).acquire()
+        kwargs.setdefault('timeout', self.timeout)
+
+        if self.cache is None:
+            return self.session.get(url, **kwargs)
+
+        cached = self.cache.lookup(url)
+        if cached:
+            headers = dict(kwargs.pop('headers', None) or {})
+            headers.update(self.cache.conditional_headers(cached))
+            kwargs['headers'] = headers
+
+        response = self.session.get(url, **kwargs)
+
+        if response.status_code == 304 and cached:
+            return self.cache.load_response(url, cached)
+
+        self.cache.store(url, response)
+        return response
+
+    def close(self):
+        """接続プールを閉じる"""
+        self.session.close()
+
+
+_default_client: Optional[HTTPClient] = None
+_default_lock = threading.Lock()
+
+
+def get_default_client() -> HTTPClient:
+    """プロセス全体で共有するHTTPクライアントを取得（初回呼び出し時に作成）"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HTTPClient()
+        return _default_client
+
+
+def configure_default_client(**kwargs) -> HTTPClient:
+    """
+    共有HTTPクライアントを指定した設定で作り直す
+
+    Args:
+        **kwargs: HTTPClient のコンストラクタ引数
+    """
+    global _default_client
+    with _default_lock:
+        if _default_client is not None:
+            _default_client.close()
+        _default_client = HTTPClient(**kwargs)
+        return _default_client
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+ページ取得層
+1回の実行中に同じURLを何度もダウンロードしないよう、取得したレスポンスを
+（ステータス、デコード済み本文、解析済みツリーごと）後続の処理に引き渡します
+"""
+
+import threading
+from typing import Dict, Optional
+
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+
+from common.html_parsing import DEFAULT_PARSER, make_soup
+
+
+class FetchedPage:
+    """1回のGETで取得したページ"""
+
+    def __init__(self, url: str, response: requests.Response):
+        self.url = url
+        self.response = response
+        self.status_code = response.status_code
+        self._text = None
+        self._soups = {}
+
+    @property
+    def encoding(self) -> str:
+        """
+        本文の文字コード
+
+        Content-Type で charset が明示されていればそれを使い、なければ本文から推定します
+        （ツリーを作らない抽出器向け。推定は本文全体を走査するため、明示されていれば省略する）
+        """
+        content_type = self.response.headers.get('Content-Type', '')
+        if 'charset=' in content_type.lower() and self.response.encoding:
+            return self.response.encoding
+        return self.response.apparent_encoding or 'utf-8'
+
+    @property
+    def text(self) -> str:
+        """デコード済みの本文"""
+        if self._text is None:
+            self.response.encoding = self.response.apparent_encoding
+            self._text = self.response.text
+        return self._text
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """文書全体の解析済みツリー（初回アクセス時に1回だけ解析）"""
+        return self.parse()
+
+    def parse(self, parser: str = DEFAULT_PARSER, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """
+        指定したパーサーで解析したツリー（パーサーと対象の組み合わせごとに1回だけ解析）
+
+        Args:
+            parser: パーサーのバックエンド
+            parse_only: 構築する要素を絞る SoupStrainer（None で文書全体）
+        """
+        key = (parser, id(parse_only) if parse_only is not None else None)
+        if key not in self._soups:
+            self._soups[key] = make_soup(self.text, parser, parse_only)
+        return self._soups[key]
+
+    def raise_for_status(self):
+        """HTTPエラーの場合は例外を送出"""
+        self.response.raise_for_status()
+
+
+class PageFetcher:
+    """URLごとに1回だけGETし、取得済みのページを使い回す"""
+
+    def __init__(self, client):
+        """
+        Args:
+            client: get(url) を持つHTTPクライアント（HTTPClient または requests.Session）
+        """
+        self.client = client
+        self._pages: Dict[str, FetchedPage] = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, url: str) -> FetchedPage:
+        """
+        ページを取得（取得済みならそのまま返す）
+
+        通信エラーは記録せずに例外として送出するため、次回の呼び出しで再試行されます
+        """
+        with self._lock:
+            page = self._pages.get(url)
+        if page is not None:
+            return page
+
+        page = FetchedPage(url, self.client.get(url))
+
+        with self._lock:
+            return self._pages.setdefault(url, page)
+
+    def discard(self, url: str):
+        """取得済みのページを破棄（メモリ解放用）"""
+        with self._lock:
+            self._pages.pop(url, None)
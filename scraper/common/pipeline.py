@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+取得・解析・保存のパイプライン
+ネットワーク待ちの取得処理（スレッド）と、CPUを使うHTML解析（プロセスプール）を分け、
+上限付きのキューでつないで並行実行します
+
+    取得スレッド × N → [生データのキュー] → 解析プロセス × M → [結果のキュー] → 保存スレッド
+
+キューが一杯になると前段が待機するため、メモリ使用量は一定に保たれます。
+Ctrl-C で中断した場合は、新しい取得を止め、解析済みの結果を保存してから終了します
+"""
+
+import os
+import queue
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# 保存スレッドへの終了通知
+_DONE = object()
+
+
+def _ignore_sigint():
+    """解析プロセスでは Ctrl-C を無視し、終了処理は親プロセスに任せる"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def run_pipeline(
+    items: Iterable[Any],
+    fetch: Callable[[Any], Tuple[str, Any]],
+    parse: Callable[[Any], Any],
+    write: Callable[[Any, Any], str],
+    fetch_workers: int = 8,
+    parse_workers: Optional[int] = None,
+    queue_size: int = 32
+) -> Dict[str, int]:
+    """
+    パイプラインを実行
+
+    Args:
+        items: 処理対象（記事IDなど）
+        fetch: 対象を受け取り (ステータス, 生データのタプル) を返す関数。ステータスが 'ok' の場合だけ
+            解析に回し、それ以外（'skip' など）はそのまま集計する
+        parse: 生データのタプルを引数として受け取り解析結果を返す関数（プロセスプールで実行するため、
+            モジュールのトップレベルに定義した関数か、その functools.partial であること）
+        write: (対象, 解析結果) を受け取って保存し、ステータスを返す関数
+        fetch_workers: 取得スレッド数
+        parse_workers: 解析プロセス数（省略時はCPUコア数）
+        queue_size: 各キューの上限
+
+    Returns:
+        ステータスごとの件数（中断された場合は 'interrupted' を含む）
+    """
+    parse_workers = parse_workers or os.cpu_count() or 1
+    stop = threading.Event()
+    counts: Dict[str, int] = {}
+    counts_lock = threading.Lock()
+
+    def count(status: str):
+        with counts_lock:
+            counts[status] = counts.get(status, 0) + 1
+
+    pending: "queue.Queue[Any]" = queue.Queue()
+    for item in items:
+        pending.put(item)
+
+    raw_queue: "queue.Queue[Tuple[Any, Any]]" = queue.Queue(maxsize=queue_size)
+    result_queue: "queue.Queue[Any]" = queue.Queue()
+    # 解析中＋保存待ちの件数の上限（保存が遅れたら解析の投入を止める）
+    in_flight = threading.BoundedSemaphore(queue_size)
+
+    def put_until_stopped(target: queue.Queue, value) -> bool:
+        while not stop.is_set():
+            try:
+                target.put(value, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetch_worker():
+        while not stop.is_set():
+            try:
+                item = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                status, payload = fetch(item)
+            except Exception as e:
+                print(f"  ❌ {item} の取得中にエラーが発生しました: {e}", flush=True)
+                count('error')
+                continue
+            if status == 'ok':
+                put_until_stopped(raw_queue, (item, payload))
+            else:
+                count(status)
+
+    def write_worker():
+        while True:
+            entry = result_queue.get()
+            if entry is _DONE:
+                return
+            item, future = entry
+            try:
+                # 中断時に取り消された解析は保存しない
+                if future.cancelled():
+                    continue
+                result = future.result()
+                count(write(item, result))
+            except Exception as e:
+                print(f"  ❌ {item} の解析・保存中にエラーが発生しました: {e}", flush=True)
+                count('error')
+            finally:
+                in_flight.release()
+
+    fetchers = [threading.Thread(target=fetch_worker, daemon=True) for _ in range(max(1, fetch_workers))]
+    writer = threading.Thread(target=write_worker, daemon=True)
+    for thread in fetchers:
+        thread.start()
+    writer.start()
+
+    executor = ProcessPoolExecutor(max_workers=parse_workers, initializer=_ignore_sigint)
+    try:
+        while True:
+            try:
+                item, payload = raw_queue.get(timeout=0.2)
+            except queue.Empty:
+                if not any(thread.is_alive() for thread in fetchers) and raw_queue.empty():
+                    break
+                continue
+            in_flight.acquire()
+            result_queue.put((item, executor.submit(parse, *payload)))
+    except KeyboardInterrupt:
+        print("\n⚠️  中断を受け付けました。解析済みの結果を保存して終了します...", flush=True)
+        stop.set()
+        counts['interrupted'] = 1
+    finally:
+        stop.set()
+        # 未着手の解析は取り消し、実行中のものは完了を待つ
+        executor.shutdown(wait=True, cancel_futures=True)
+        for thread in fetchers:
+            thread.join()
+        result_queue.put(_DONE)
+        writer.join()
+
+    return counts
@@ -27,14 +27,14 @@ for category in "${CATEGORIES[@]}"; do
     # 1. 記事本文を取得
     echo "【ステップ1】記事本文の取得"
     cd articles
-    ./run_batch.sh --start 1 --end 300 --category "$category"
+    ./run_batch.sh --start 1 --end 300 --category "$category" --http-cache
     cd ..
     echo ""
     
     # 2. コメントを取得
     echo "【ステップ2】コメントの取得"
     cd comments_scraper
-    ./run_batch.sh --start 1 --end 300 --category "$category"
+    ./run_batch.sh --start 1 --end 300 --category "$category" --http-cache
     cd ..
     echo ""
     